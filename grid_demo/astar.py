@@ -1,8 +1,14 @@
 """
 A* algorithm worker.
 """
+import heapq
+import math
+
+from itertools import count
 from threading import Thread
 
+from grid_demo.world import Material
+
 
 class AStar(Thread):
     """
@@ -17,11 +23,83 @@ class AStar(Thread):
     def __init__(self, world, start, end):
         super().__init__()
         self.world = world
-        self.start = start
-        self.end = end
+        # do not shadow Thread.start()
+        self.start_point = tuple(int(x) for x in start)
+        self.end_point = tuple(int(x) for x in end)
 
         self.v_open = []
-        self.v_closed = []
+        """Open set min-heap of (f_score, tiebreak, node) entries."""
+
+        self.v_closed = set()
+        """Nodes that have already been expanded."""
+
+        self.g_score = {}
+        """Best known cost from the start to each node."""
+
+        self.came_from = {}
+        """Predecessor of each node along its best known path."""
+
+        self.path = None
+        """Path from start to end, None if there is no path."""
+
+        self._tiebreak = count()
+        """Insertion counter, keeps heap order stable on equal f_score."""
+
+        self._h_cache = {}
+        """Memoized heuristic values, nodes are relaxed more than once."""
+
+    def heuristic(self, node):
+        """
+        Estimated cost from a node to the end point.
+
+        :param node: n-d point
+        :return: euclidean distance to the end point
+        """
+        h_score = self._h_cache.get(node)
+        if h_score is None:
+            h_score = math.sqrt(sum((a - b) ** 2
+                                    for a, b in zip(node, self.end_point)))
+            self._h_cache[node] = h_score
+        return h_score
+
+    def _push(self, node, g_score):
+        """
+        Record a better cost for a node and add it to the open set.
+
+        Entries already in the heap are not updated in place, the stale
+        ones are skipped when popped because the node is closed by then.
+        """
+        self.g_score[node] = g_score
+        f_score = g_score + self.heuristic(node)
+        heapq.heappush(self.v_open, (f_score, next(self._tiebreak), node))
+
+    def _build_path(self, node):
+        """Walk back the predecessors from a node to the start."""
+        path = [node]
+        while node in self.came_from:
+            node = self.came_from[node]
+            path.append(node)
+        path.reverse()
+        return path
 
     def run(self):
-        pass
+        # compare with a scalar of the grid dtype once for the whole
+        # world, rather than with the enum for each neighbour
+        grid = self.world.all()
+        walls = grid == grid.dtype.type(Material.WALL)
+        self._push(self.start_point, 0)
+        while self.v_open:
+            _, _, node = heapq.heappop(self.v_open)
+            if node in self.v_closed:
+                continue
+            if node == self.end_point:
+                self.path = self._build_path(node)
+                return
+            self.v_closed.add(node)
+            g_score = self.g_score[node] + 1
+            for neighbour in self.world.orthogonal_neighbours(node):
+                if neighbour in self.v_closed or walls[neighbour]:
+                    continue
+                if g_score < self.g_score.get(neighbour, math.inf):
+                    self.came_from[neighbour] = node
+                    self._push(neighbour, g_score)
@@ -5,17 +5,19 @@ Qt5 GUI interface.
 import sys
 import enum
 import logging
+import math
 
-from itertools import starmap, repeat, chain
+from collections import defaultdict
 
 import numpy as np
 
 from PyQt5.QtWidgets import QApplication, QWidget, QMainWindow
 from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout, QSizePolicy, QGridLayout
-from PyQt5.QtWidgets import QGroupBox, QScrollArea
+from PyQt5.QtWidgets import QGroupBox, QScrollArea, QStackedWidget
 from PyQt5.QtWidgets import QPushButton, QLabel, QSpinBox, QRadioButton
-from PyQt5.QtGui import QPainter, QBrush, QColor, QPen, QTransform
-from PyQt5.QtCore import QRect, QLineF
+from PyQt5.QtGui import QPainter, QBrush, QColor, QPen, QImage
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import Qt, QRect, QLineF, QPointF, QRectF, QTimer
 from PyQt5.QtCore import pyqtSignal, pyqtSlot
 
 from grid_demo.world import WorldModelND, Material
@@ -97,7 +99,7 @@ class Window(QMainWindow):
         self.world_mgr.model_changed.connect(self.grid.model_changed)
         self.world_mgr.model_shape_changed.connect(
             self.grid.model_shape_changed)
-        self.grid.pick_position.connect(self.world_mgr.pick_position)
+        self.grid.pick_positions.connect(self.world_mgr.pick_positions)
 
         # initialize everything with defaults
         self.gui_selector.reset_default()
@@ -172,6 +174,9 @@ class Selector(QWidget):
     grid_shape_selected = pyqtSignal(tuple)
     """Signal emitted when the user resizes the grid."""
 
+    apply_interval = 50
+    """Interval in ms to wait for more settings changes before applying."""
+
     def __init__(self):
         """
         Selector widget constructor.
@@ -206,12 +211,21 @@ class Selector(QWidget):
         box_layout.addSpacing(10)
         box_layout.addWidget(btn_apply_settings)
 
+        self._last_shape = None
+        """Last grid shape emitted."""
+
+        self._apply_timer = QTimer(self)
+        self._apply_timer.setSingleShot(True)
+        self._apply_timer.setInterval(self.apply_interval)
+        self._apply_timer.timeout.connect(self._emit_shape)
+
     def reset_default(self):
         """Reset the widget to the default state."""
         self._update_dimensions(2)
         self.dimension_spinbox[0].setValue(10)
         self.dimension_spinbox[1].setValue(10)
-        self.grid_shape_selected.emit((10, 10))
+        self._last_shape = (10, 10)
+        self.grid_shape_selected.emit(self._last_shape)
 
     @pyqtSlot(int)
     def _update_dimensions(self, value):
@@ -237,10 +251,20 @@ class Selector(QWidget):
         """
         Qt click event slot on the settings confirmation button.
 
-        Trigger the grid_update signal.
+        Trigger the grid_update signal, repeated clicks within
+        apply_interval are merged into a single update.
+        """
+        self._apply_timer.start()
+
+    def _emit_shape(self):
+        """
+        Qt timer slot that emits the selected grid shape, if it
+        changed since the last one emitted.
         """
-        new_shape = (spinbox.value() for spinbox in self.dimension_spinbox)
-        self.grid_shape_selected.emit(tuple(new_shape))
+        new_shape = tuple(spinbox.value() for spinbox in self.dimension_spinbox)
+        if new_shape != self._last_shape:
+            self._last_shape = new_shape
+            self.grid_shape_selected.emit(new_shape)
 
 
 class BuildSelector(QWidget):
@@ -336,28 +360,33 @@ class ViewBuilder:
         """Initialize the builder with the parent view."""
         self._view = view
 
-    def destroy(self):
+        self.page = QWidget()
         """
-        Deregister all the sub-widgets and destroy everything.
+        Widget holding the builder displays, owned by the view stack
+        once added to it.
         """
-        logger.debug("Destroy view builder %s", self.__class__)
+        self.page.setLayout(QGridLayout())
+        self.page.layout().setContentsMargins(0, 0, 0, 0)
 
-    def redraw(self, manager):
+    def redraw(self, manager, changed=None):
         """
         Redraw the scene with the given world manager.
 
         :param manager: a WorldManager to use
+        :param changed: iterable of world points that changed,
+        None to redraw everything.
         """
-        logger.debug("Redraw world %s, %s", self.__class__, manager.size)
+        logger.debug("Redraw world %s, %s changed:%s", self.__class__,
+                     manager.size, changed)
 
-    def signal_point_selected(self, p):
+    def signal_points_selected(self, points):
         """
-        Generate a pick-position signal from a display in
-        the grid view.
+        Generate a single pick-positions signal for a batch of points
+        selected from a display in the grid view.
 
-        :param p: point selected
+        :param points: iterable of points selected
         """
-        self._view.pick_position.emit(p)
+        self._view.pick_positions.emit(tuple(points))
 
     def signal_range_selected(self, p, q):
         """
@@ -380,29 +409,56 @@ class Grid2DViewBuilder(ViewBuilder):
     def __init__(self, view):
         super().__init__(view)
 
-        layout = view.layout()
+        layout = self.page.layout()
 
         self.xy_display = Grid2DDisplay(self)
         layout.addWidget(self.xy_display, 0, 0)
 
-    def destroy(self):
-        self.xy_display.deleteLater()
-        super().destroy()
+        self._planes = None
+        """Cached result of :meth:`planes`."""
 
-    def redraw(self, manager):
+        self._planes_dimension = None
+        """World dimension of the cached planes."""
+
+        self._world_version = None
+        """Version of the world shown by the displays."""
+
+    def planes(self, manager):
         """
-        Set the 2-d slice of the world to draw and
-        redraw the display.
+        Return the displays of the builder paired with the
+        projection of the world they show.
+
+        :param manager: a WorldManager to use
+        :return: list of (display, projection) pairs
         """
-        super().redraw(manager)
         assert manager.world.dimension >= 2, "Too few dimensions in the world"
-        world_grid = manager.world.all()
-
         # axis indices
         ax0, ax1 = manager.world.axes_index(0, 1)
-        xy_plane = Project2D(ax0, ax1)
-        self.xy_display.set_world(xy_plane.projection(world_grid))
-        self.xy_display.redraw()
+        return [(self.xy_display, Project2D(ax0, ax1))]
+
+    def redraw(self, manager, changed=None):
+        """
+        Set the 2-d slices of the world to draw and
+        redraw the displays.
+        """
+        super().redraw(manager, changed)
+        if self._world_version == manager.version:
+            # the displays are already up to date
+            return
+        self._world_version = manager.version
+        # the planes only depend on the number of world dimensions
+        if self._planes_dimension != manager.world.dimension:
+            self._planes = self.planes(manager)
+            self._planes_dimension = manager.world.dimension
+        displays, planes = zip(*self._planes)
+        world_grid = manager.world.all()
+        projected = Project2D.projection_many(world_grid, planes)
+        for display, plane, pgrid in zip(displays, planes, projected):
+            display.set_world(pgrid)
+            if changed is None:
+                display.redraw()
+            else:
+                display.redraw(map(plane.project_point, changed))
 
 
 class Grid3DOrthogonalViewBuilder(Grid2DViewBuilder):
@@ -417,22 +473,15 @@ class Grid3DOrthogonalViewBuilder(Grid2DViewBuilder):
     def __init__(self, view):
         super().__init__(view)
 
-        layout = view.layout()
+        layout = self.page.layout()
 
         self.yz_display = Grid2DDisplay(self)
         self.xz_display = Grid2DDisplay(self)
         layout.addWidget(self.yz_display, 0, 1)
         layout.addWidget(self.xz_display, 1, 0)
 
-    def destroy(self):
-        self.yz_display.deleteLater()
-        self.xz_display.deleteLater()
-        super().destroy()
-
-    def redraw(self, manager):
-        super().redraw(manager)
-        world_grid = manager.world.all()
-
+    def planes(self, manager):
+        planes = super().planes(manager)
         # axis indices
         ax0, ax1, ax2 = manager.world.axes_index(0, 1, 2)
         if manager.world.dimension >= 3:
@@ -441,11 +490,9 @@ class Grid3DOrthogonalViewBuilder(Grid2DViewBuilder):
         else:
             yz_plane = Project2D(ax1, ax1)
             xz_plane = Project2D(ax0, ax0)
-
-        self.yz_display.set_world(yz_plane.projection(world_grid))
-        self.xz_display.set_world(xz_plane.projection(world_grid))
-        self.yz_display.redraw()
-        self.xz_display.redraw()
+        planes.append((self.yz_display, yz_plane))
+        planes.append((self.xz_display, xz_plane))
+        return planes
 
 
 class Grid2DDisplay(QWidget):
@@ -456,6 +503,15 @@ class Grid2DDisplay(QWidget):
     that is given to draw have strictly 2 dimensions.
     """
 
+    min_grid_cell_size = 3
+    """
+    Minimum distance in pixels between grid lines, on smaller cells
+    only one line every few cells is drawn.
+    """
+
+    pick_interval = 16
+    """Interval in ms between batches of cells picked while dragging."""
+
     def __init__(self, builder):
         """
         Initialize brushes and pens, add the display
@@ -468,89 +524,257 @@ class Grid2DDisplay(QWidget):
 
         self.current_world = None
 
+        # the backbuffer covers the whole widget, so Qt does not need
+        # to erase the background, and only drags are handled
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
+        self.setAttribute(Qt.WA_NoSystemBackground, True)
+        self.setMouseTracking(False)
+
         self.background = QBrush(GridView.colors["background"])
         self.grid_pen = QPen(GridView.colors["grid_line"])
-        self.wall_brush = QBrush(GridView.colors["wall"])
+        self.grid_pen.setWidth(0)
         self.start_brush = QBrush(GridView.colors["start"])
         self.end_brush = QBrush(GridView.colors["end"])
 
         self.last_selected_cell = None
         """Coords of the last grid cell selected by the user."""
 
+        self._static_cache = None
+        """
+        Transparent pixmap with the frame and grid lines, these only
+        depend on the world shape and the widget size.
+        """
+
+        self._color_table = [GridView.colors["background"].rgb(),
+                             GridView.colors["wall"].rgb()]
+        """Backbuffer colors, indexed by Material value."""
+
+        self._material_tiles = []
+        """Single pixel pixmaps for each backbuffer color."""
+        for color in self._color_table:
+            tile = QPixmap(1, 1)
+            tile.fill(QColor(color))
+            self._material_tiles.append(tile)
+
+        self._backbuffer = None
+        """Pixmap of the world contents, with one pixel for each cell."""
+
+        self._pending_cells = set()
+        """Cells picked by the user that are not yet signaled."""
+
+        self._pick_timer = QTimer(self)
+        self._pick_timer.setSingleShot(True)
+        self._pick_timer.setInterval(self.pick_interval)
+        self._pick_timer.timeout.connect(self._flush_cells)
+
+        self._cell_size = (1, 1)
+        """Size of a cell in pixels (width, height)."""
+
+        self._inv_cell_size = (1, 1)
+        """Inverse of the cell size, cells per pixel (x, y)."""
+
     def set_world(self, world):
         """
         Set current world grid to draw.
 
         :param world: a 2-d numpy array of Material values.
         """
-        self.current_world = world
+        if (self.current_world is None or
+                self.current_world.shape != world.shape):
+            self._static_cache = None
+            self._backbuffer = None
+            self.current_world = world
+            self._update_cell_size()
+        else:
+            self.current_world = world
+
+    def _update_cell_size(self):
+        """Update the cached cell size after a resize or reshape."""
+        if self.current_world is None:
+            return
+        max_x, max_y = self.current_world.shape
+        width = max(self.width(), 1)
+        height = max(self.height(), 1)
+        self._cell_size = (width / max_x, height / max_y)
+        self._inv_cell_size = (max_x / width, max_y / height)
+
+    def resizeEvent(self, evt):
+        """Qt resize event handler."""
+        super().resizeEvent(evt)
+        self._static_cache = None
+        self._update_cell_size()
+
+    def redraw(self, cells=None):
+        """
+        Redraw the grid.
 
-    def redraw(self):
-        """Redraw the grid."""
-        self.repaint()
+        :param cells: iterable of cells to redraw, None
+        to redraw the whole grid.
+        """
+        if cells is None or self._backbuffer is None:
+            self._backbuffer = None
+            self.update()
+        else:
+            # mouse moves are still delivered while dragging outside
+            # the widget, these cells are not in the world
+            max_x, max_y = self.current_world.shape
+            cells = [(x, y) for x, y in cells
+                     if 0 <= x < max_x and 0 <= y < max_y]
+            self._update_backbuffer(cells)
+            for cell in cells:
+                self.update(self.cell2rect(*cell))
 
     def coords2cell(self, x, y):
         """Convert event coordinates to cell coordinates."""
+        inv_width, inv_height = self._inv_cell_size
+        return (int(x * inv_width), int(y * inv_height))
+
+    def cell2rect(self, x, y):
+        """
+        Convert cell coordinates to the widget rectangle covering it,
+        the borders are included to update the grid lines.
+        """
+        cell_width, cell_height = self._cell_size
+        left = int(x * cell_width)
+        top = int(y * cell_height)
+        right = math.ceil((x + 1) * cell_width)
+        bottom = math.ceil((y + 1) * cell_height)
+        return QRect(left - 1, top - 1, right - left + 2, bottom - top + 2)
+
+    def _build_backbuffer(self):
+        """
+        Build the backbuffer pixmap of the whole world.
+
+        The world materials are used directly as the pixel indices
+        of an indexed image, so no per-cell drawing is needed. The
+        image is converted once to a pixmap, which is cheaper to blit.
+        """
         max_x, max_y = self.current_world.shape
-        cell_width = self.width() / max_x
-        cell_height = self.height() / max_y
-        cell_x = int(x / cell_width)
-        cell_y = int(y / cell_height)
-        return (cell_x, cell_y)
+        # image scanlines run along x
+        pixels = np.ascontiguousarray(self.current_world.T, dtype=np.uint8)
+        image = QImage(pixels.data, max_x, max_y, max_x,
+                       QImage.Format_Indexed8)
+        image.setColorTable(self._color_table)
+        return QPixmap.fromImage(image)
+
+    def _update_backbuffer(self, cells):
+        """
+        Draw the given cells of the world in the backbuffer.
+
+        Cells are grouped by material and each group is blitted
+        from the material tile with a single call.
+        """
+        fragments = defaultdict(list)
+        # the whole tile is the source of every fragment
+        source = QRectF(0, 0, 1, 1)
+        for x, y in cells:
+            fragment = QPainter.PixmapFragment.create(
+                QPointF(x + 0.5, y + 0.5), source)
+            fragments[self.current_world[x, y]].append(fragment)
+        painter = QPainter(self._backbuffer)
+        for material, group in fragments.items():
+            painter.drawPixmapFragments(group, self._material_tiles[material])
+        painter.end()
 
     def _draw_frame(self, painter):
         """Draw the widget frame box."""
         max_x, max_y = self.current_world.shape
-        self.grid_pen.setWidth(0)
-        painter.fillRect(0, 0, max_x, max_y, self.background)
         painter.setPen(self.grid_pen)
         painter.drawRect(0, 0, max_x, max_y)
 
+    def _grid_stride(self):
+        """
+        Return the number of cells between grid lines along each
+        axis, so that lines are at least min_grid_cell_size apart.
+        """
+        inv_width, inv_height = self._inv_cell_size
+        min_size = self.min_grid_cell_size
+        stride_x = math.ceil(min_size * inv_width)
+        stride_y = math.ceil(min_size * inv_height)
+        return (max(stride_x, 1), max(stride_y, 1))
+
+    def _build_grid_lines(self, stride):
+        """Build the grid lines for the current world shape."""
+        max_x, max_y = self.current_world.shape
+        stride_x, stride_y = stride
+        x_lines = [QLineF(x, 0, x, max_y) for x in range(0, max_x, stride_x)]
+        y_lines = [QLineF(0, y, max_x, y) for y in range(0, max_y, stride_y)]
+        return x_lines + y_lines
+
     def _draw_grid(self, painter):
         """Draw the grid lines."""
+        painter.drawLines(self._build_grid_lines(self._grid_stride()))
+
+    def _set_cell_window(self, painter):
+        """
+        Map the painter logical coordinates to cells, the world
+        rectangle covers the whole widget.
+        """
         max_x, max_y = self.current_world.shape
-        x_ticks = np.arange(0, max_x)
-        y_ticks = np.arange(0, max_y)
-        x_segs = zip(x_ticks, repeat(0), x_ticks, repeat(max_y))
-        y_segs = zip(repeat(0), y_ticks, repeat(max_x), y_ticks)
-        grid_lines = chain(starmap(QLineF, x_segs), starmap(QLineF, y_segs))
-        painter.drawLines(grid_lines)
-
-    def _draw_world(self, painter):
-        """Draw the world contents."""
-        logger.debug("current world: %s", self.current_world)
-        for (x, y), val in np.ndenumerate(self.current_world):
-            if val == Material.WALL:
-                painter.fillRect(QRect(x, y, 1, 1), self.wall_brush)
-
-    def paintEvent(self, event):
+        painter.setWindow(0, 0, max_x, max_y)
+        painter.setViewport(self.rect())
+
+    def _build_static_cache(self):
+        """
+        Build the static layer pixmap, drawing the frame and
+        the grid lines once in cell coordinates.
+        """
+        cache = QPixmap(self.size())
+        cache.fill(Qt.transparent)
+        painter = QPainter(cache)
+        self._set_cell_window(painter)
+        self._draw_frame(painter)
+        self._draw_grid(painter)
+        painter.end()
+        return cache
+
+    def paintEvent(self, event): # pylint: disable=unused-argument
         """Qt paint event slot handler."""
         if self.current_world is None:
             logger.debug("GridView: no world to paint")
+            # the widget is opaque, the background is not erased by Qt
+            QPainter(self).fillRect(self.rect(), self.background)
             return
-        # get the draw rectangle
-        rect = event.rect()
-        max_x, max_y = self.current_world.shape
-        # build the painter and set the coordinates scale
-        # transformation + the zoom transform
+        # the painter is clipped to the region that needs to be
+        # redrawn, both layers are blitted in widget coordinates,
+        # the backbuffer is scaled from one pixel per cell
+        if self._backbuffer is None:
+            self._backbuffer = self._build_backbuffer()
+        if self._static_cache is None:
+            self._static_cache = self._build_static_cache()
         painter = QPainter(self)
-        transform = QTransform()
-        transform.scale((rect.right() - rect.left()) / max_x,
-                        (rect.bottom() - rect.top()) / max_y)
-        painter.setTransform(transform)
-
-        self._draw_frame(painter)
-        self._draw_grid(painter)
-        self._draw_world(painter)
+        painter.drawPixmap(self.rect(), self._backbuffer)
+        painter.drawPixmap(0, 0, self._static_cache)
 
     def mouseMoveEvent(self, evt):
         """
         Qt mouse event handler.
         """
+        if evt.buttons() == Qt.NoButton:
+            return
         cell = self.coords2cell(evt.x(), evt.y())
         if cell != self.last_selected_cell:
             self.last_selected_cell = cell
-            self.builder.signal_point_selected(cell)
+            self._pick_cell(cell)
+
+    def _pick_cell(self, cell):
+        """
+        Add a cell to the pending batch of picked cells.
+
+        Mouse moves are faster than redraws, picked cells are signaled
+        in batches at most once every pick_interval.
+        """
+        self._pending_cells.add(cell)
+        if not self._pick_timer.isActive():
+            self._pick_timer.start()
+
+    def _flush_cells(self):
+        """
+        Qt timer slot that signals the pending batch of picked cells.
+        """
+        cells = self._pending_cells
+        self._pending_cells = set()
+        self.builder.signal_points_selected(cells)
 
     def mousePressEvent(self, evt):
         """
@@ -559,7 +783,7 @@ class Grid2DDisplay(QWidget):
         cell = self.coords2cell(evt.x(), evt.y())
         if cell != self.last_selected_cell:
             self.last_selected_cell = cell
-            self.builder.signal_point_selected(cell)
+            self._pick_cell(cell)
 
     def mouseReleaseEvent(self, evt): # pylint: disable=unused-argument
         """
@@ -581,8 +805,8 @@ class GridView(QWidget):
     will be latched at 0.
     """
 
-    pick_position = pyqtSignal(tuple)
-    """Signal emitted when a position is picked by the user on the grid."""
+    pick_positions = pyqtSignal(tuple)
+    """Signal emitted with a batch of positions picked by the user."""
 
     colors = {
         "background": QColor(250, 250, 250),
@@ -601,10 +825,22 @@ class GridView(QWidget):
         """
         super().__init__()
 
-        self.setLayout(QGridLayout())
+        self.setLayout(QVBoxLayout())
+        self._stack = QStackedWidget()
+        self.layout().addWidget(self._stack)
+
+        self.view_builders = {}
+        """
+        Display strategies for 2D, 3D and other world sizes, they are
+        all built upfront so that switching only changes the page shown.
+        """
+        for builder_class in (Grid2DViewBuilder, Grid3DOrthogonalViewBuilder):
+            builder = builder_class(self)
+            self._stack.addWidget(builder.page)
+            self.view_builders[builder.vtype] = builder
 
         self.view_manager = None
-        """Display strategy for 2D, 3D and other world sizes."""
+        """Current display strategy."""
 
     @pyqtSlot(ViewType)
     def view_type_changed(self, vtype):
@@ -614,22 +850,19 @@ class GridView(QWidget):
 
         :param vtype: the new ViewType to use
         """
-        if self.view_manager is None or self.view_manager.vtype != vtype:
-            if self.view_manager:
-                self.view_manager.destroy()
-                self.view_manager = None
-            if vtype == ViewType.GRID_2D:
-                self.view_manager = Grid2DViewBuilder(self)
-            elif vtype == ViewType.MULTIGRID_3D:
-                self.view_manager = Grid3DOrthogonalViewBuilder(self)
+        self.view_manager = self.view_builders[vtype]
+        self._stack.setCurrentWidget(self.view_manager.page)
 
-    @pyqtSlot(WorldManager)
-    def model_changed(self, manager):
+    @pyqtSlot(WorldManager, object)
+    def model_changed(self, manager, changed):
         """
         Qt signal slot that receives updates from the world manager,
         whenever some position state has changed.
+
+        :param changed: tuple of changed world points, None if
+        the whole world must be redrawn.
         """
-        self.view_manager.redraw(manager)
+        self.view_manager.redraw(manager, changed)
 
     @pyqtSlot(WorldManager)
     def model_shape_changed(self, manager):
@@ -637,4 +870,4 @@ class GridView(QWidget):
         Qt signal slot that receives update from the world manager,
         whenever the world is reshaped.
         """
-        self.model_changed(manager)
+        self.model_changed(manager, None)
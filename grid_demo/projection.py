@@ -36,37 +36,92 @@ class ProjectMD(Projection):
         """
         self.axes = np.unique(axes)
 
-    def _get_full_index(self, axes, dimension):
+    @staticmethod
+    def solid_mask(grid):
         """
-        Return in indexin object for the world with generic
-        slices in the correct axes.
+        Return the mask of the non-AIR cells in the grid.
 
-        :param axes: the indices on the projection axes.
-        :param dimension: the maximum world dimension
-        :return: list of index elements
+        :param grid: the n-d world
+        :return: boolean n-d grid
         """
-        indexer = [slice(None)] * dimension
-        for axis_idx, idx in zip(self.axes, axes):
-            indexer[axis_idx] = idx
-        return tuple(indexer)
+        # compare with a scalar of the grid dtype, the enum would
+        # upcast the whole grid to int64
+        return grid != grid.dtype.type(Material.AIR)
+
+    @staticmethod
+    def projection_many(grid, projections):
+        """
+        Perform multiple projections of the same grid.
+        The solid mask of the grid is computed once and shared.
+
+        :param grid: the n-d world to project.
+        :param projections: iterable of :class:`ProjectMD`
+        :return: list of projected grids, in the same order
+        """
+        projections = list(projections)
+        if any(proj.collapses(grid) for proj in projections):
+            solid = ProjectMD.solid_mask(grid)
+        else:
+            solid = None
+        return [proj.project_solid(grid, solid) for proj in projections]
+
+    def collapses(self, grid):
+        """
+        Check whether the projection collapses some axes of the grid.
+
+        :param grid: the n-d world to project.
+        :return: False if the projection is a view on the grid itself
+        """
+        return len(self.axes) < grid.ndim
+
+    def project_point(self, p):
+        """
+        Return the coordinates of a world point in the projection.
+
+        :param p: n-d point
+        :return: m-tuple of coordinates
+        """
+        return tuple(int(p[axis]) for axis in self.axes)
+
+    def _front_axes(self, grid):
+        """
+        Return a view of the grid with the projection axes moved in
+        front of the others.
+        """
+        drop = np.delete(np.arange(grid.ndim), self.axes)
+        order = np.concatenate((self.axes, drop))
+        return np.moveaxis(grid, order, np.arange(grid.ndim))
 
     def projection(self, grid):
+        return self.projection_many(grid, (self,))[0]
+
+    def project_solid(self, grid, solid):
+        """
+        Perform the projection given the solid mask of the grid.
+
+        :param grid: the n-d world to project.
+        :param solid: the :meth:`solid_mask` of the grid, only
+        required if the projection :meth:`collapses` the grid.
+        :return: m-d grid with projected values
+        """
         assert len(grid.shape) >= len(self.axes),\
             "Invalid projection source space"
-        grid_shape = np.array(grid.shape)
-        out_shape = grid_shape[self.axes]
-        slice_shape = np.delete(grid_shape, self.axes)
-        pgrid = np.zeros(out_shape)
-        for idx in np.ndindex(*out_shape):
-            full_index = self._get_full_index(idx, len(grid.shape))
-            ndslice = np.reshape(grid[full_index], np.prod(slice_shape))
-            solid = (ndslice != Material.AIR)
-            if solid.any():
-                material = ndslice[ndslice != Material.AIR][0]
-            else:
-                material = Material.AIR
-            pgrid[idx] = material
-        return pgrid
+        if not self.collapses(grid):
+            # the projection axes are sorted and cover the whole grid,
+            # so the projection is the grid itself
+            return grid
+        grid = self._front_axes(grid)
+        out_shape = grid.shape[:len(self.axes)]
+        drop_shape = grid.shape[len(self.axes):]
+        # flatten the other axes so that each output cell maps to a row
+        # and find the first solid element of each row, rows without
+        # solid elements yield 0 which is an AIR element itself
+        rows = np.reshape(self._front_axes(solid), out_shape + (-1,))
+        first = rows.argmax(axis=-1)
+        # gather the values from the grid view, without copying it
+        index = tuple(np.indices(out_shape))
+        index += np.unravel_index(first, drop_shape)
+        return grid[index]
 
 
 class Project2D(ProjectMD):
@@ -80,8 +135,14 @@ class Project2D(ProjectMD):
     def __init__(self, ax0, ax1):
         super().__init__((ax0, ax1))
 
-    def projection(self, grid):
-        pgrid = super().projection(grid)
+    def project_point(self, p):
+        point = super().project_point(p)
+        if len(point) == 1:
+            return point + (0,)
+        return point
+
+    def project_solid(self, grid, solid):
+        pgrid = super().project_solid(grid, solid)
         if len(pgrid.shape) == 1:
             return np.reshape(pgrid, (pgrid.shape[0], 1))
         return pgrid
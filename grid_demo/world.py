@@ -24,10 +24,15 @@ class WorldModelND:
     This is the base of the algorithm simulations.
     """
 
+    dtype = np.uint8
+    """Grid storage type, large enough for any :class:`Material` value."""
+
     def __init__(self, shape, grid=None):
         """
         :param shape: n-iterable containing the grid size
         along each direction.
+        :param grid: optional initial grid, converted to the
+        world grid dtype.
         """
 
         if (np.array(shape) <= 0).any():
@@ -43,9 +48,9 @@ class WorldModelND:
         """The world grid."""
 
         if grid is None:
-            self._grid = np.zeros(shape)
+            self._grid = np.zeros(shape, dtype=self.dtype)
         else:
-            self._grid = grid
+            self._grid = np.asarray(grid, dtype=self.dtype)
 
     def axes_index(self, *args):
         """
@@ -56,8 +61,9 @@ class WorldModelND:
         returned. E.g. in a 3D world we have x = (x0, x1, x2), the coordinate
         index for x0 is <0> so axes_index(0) will return the grid axis for
         coordinate x0.
+        :return: tuple of axis indices
         """
-        return self._dimension - 1 - np.array(args)
+        return tuple(self._dimension - 1 - int(arg) for arg in args)
 
     @property
     def shape(self):
@@ -104,38 +110,75 @@ class WorldModelND:
     def _normalize_point_input(self, p):
         """
         Check that the input have the correct dimension and
-        return the point as a numpy array.
+        return the point as a tuple of ints.
         """
         if p is None:
             return None
         assert len(p) == self.dimension,\
             "dimension do not match world dim:%d, world:%d" % (
                 self.dimension, len(p))
-        return np.array(p, dtype=int)
+        return tuple(int(x) for x in p)
 
     def _check_rect_ordering(self, p, q):
         """
         Check that two points are suitable to represent an n-d rectangle.
         """
-        assert (p <= q).sum() == self.dimension, "q coordinates must be >= p"
+        assert all(pi <= qi for pi, qi in zip(p, q)),\
+            "q coordinates must be >= p"
 
-    def fill(self, p, q, material):
+    def _rect_index(self, p, q):
         """
-        Fill a n-d rectangle with given material.
+        Return the index of the n-d rectangle between two points,
+        both included, clipped to the world grid.
 
         :param p: bottom "left" vertex (closest to origin)
         :param q: top right vertex
-        :param material: the material value to set
+        :return: tuple of slices
         """
         p = self._normalize_point_input(p)
         q = self._normalize_point_input(q)
         self._check_rect_ordering(p, q)
-        q = q + 1
-        if (self._grid.shape < q).any():
-            q = self._grid.shape
-        logger.debug("World fill %s %s", p, q)
-        coords = np.meshgrid(*starmap(np.arange, zip(p, q)), indexing="ij")
-        self._grid[coords] = material
+        q = tuple(min(qi + 1, size) for qi, size in zip(q, self._grid.shape))
+        return tuple(starmap(slice, zip(p, q)))
+
+    def fill(self, p, q, material):
+        """
+        Fill a n-d rectangle with given material.
+
+        :param p: bottom "left" vertex (closest to origin)
+        :param q: top right vertex
+        :param material: the material value to set
+        """
+        rect = self._rect_index(p, q)
+        logger.debug("World fill %s", rect)
+        self._grid[rect] = material
+
+    def fill_points(self, points, material):
+        """
+        Fill a set of points with given material in a single
+        assignment, points outside the world are ignored.
+
+        :param points: iterable of point coordinates
+        :param material: the material value to set
+        :return: (n, dimension) array of the distinct points that
+        changed material
+        """
+        points = np.array(list(points), dtype=int)
+        assert points.size == 0 or points.shape[-1] == self.dimension,\
+            "dimension do not match world dim:%d, points:%s" % (
+                self.dimension, points.shape)
+        points = points.reshape(-1, self.dimension)
+        inside = np.all((points >= 0) & (points < self._grid.shape), axis=1)
+        # a point given more than once must be reported once, dedup
+        # the flat grid offsets, np.unique has no axis before numpy 1.13
+        offsets = np.ravel_multi_index(tuple(points[inside].T),
+                                       self._grid.shape)
+        index = np.unravel_index(np.unique(offsets), self._grid.shape)
+        changed = self._grid[index] != self.dtype(material)
+        logger.debug("World fill %d points, %d changed", len(index[0]),
+                     np.count_nonzero(changed))
+        self._grid[index] = material
+        return np.transpose(index)[changed]
 
     def point(self, p, material):
         """
@@ -146,11 +189,21 @@ class WorldModelND:
         """
         self.fill(p, p, material)
 
+    @staticmethod
+    def _readonly(grid):
+        """
+        Return a read-only view of the given grid, so that callers
+        can not modify the world without going through the model.
+        """
+        view = grid.view()
+        view.flags.writeable = False
+        return view
+
     def all(self):
         """
-        Return a view on the whole world.
+        Return a read-only view on the whole world.
         """
-        return np.array(self._grid)
+        return self._readonly(self._grid)
 
     def query(self, p, q=None):
         """
@@ -158,18 +211,13 @@ class WorldModelND:
 
         :param p: bottom "left" vertex (closest to origin)
         :param q: top right vertex (optional)
+        :return: read-only view on the world rectangle
         """
         if q is None:
             q = p
-        p = self._normalize_point_input(p)
-        q = self._normalize_point_input(q)
-        self._check_rect_ordering(p, q)
-        q = q + 1
-        if (self._grid.shape < q).any():
-            q = self._grid.shape
-        logger.debug("World query %s %s", p, q)
-        coords = np.meshgrid(*starmap(np.arange, zip(p, q)), indexing="ij")
-        return self._grid[coords]
+        rect = self._rect_index(p, q)
+        logger.debug("World query %s", rect)
+        return self._readonly(self._grid[rect])
 
     def replace(self, p, q, grid):
         """
@@ -179,13 +227,9 @@ class WorldModelND:
         :param q: top right vertex
         :param grid: replacement block
         """
-        p = self._normalize_point_input(p)
-        q = self._normalize_point_input(q)
-        self._check_rect_ordering(p, q)
-        q = q + 1
-        logger.debug("World replace %s %s grid:%s", p, q, grid.shape)
-        coords = np.meshgrid(*starmap(np.arange, zip(p, q)), indexing="ij")
-        self._grid[coords] = grid
+        rect = self._rect_index(p, q)
+        logger.debug("World replace %s grid:%s", rect, grid.shape)
+        self._grid[rect] = grid
 
     def orthogonal_neighbours(self, p):
         """
@@ -193,9 +237,17 @@ class WorldModelND:
 
         In the n-d case it is not really 4, but orthogonal in general.
         :param p: n-d point
-        :return: list of n-d points
+        :return: list of n-d points inside the world, as tuples of ints
         """
-        pass
+        p = self._normalize_point_input(p)
+        neighbours = []
+        for axis, size in enumerate(self._grid.shape):
+            coord = p[axis]
+            if coord > 0:
+                neighbours.append(p[:axis] + (coord - 1,) + p[axis + 1:])
+            if coord < size - 1:
+                neighbours.append(p[:axis] + (coord + 1,) + p[axis + 1:])
+        return neighbours
 
     def diagonal_neighbours(self, p):
         """
@@ -26,6 +26,12 @@ class WorldManager:
         self.world = world
         self.current_material = Material.AIR
 
+        self.version = 0
+        """
+        World version counter, increased every time the world is
+        changed or replaced through the manager.
+        """
+
     @property
     def size(self):
         """Shortcut for the world maximum coordinates."""
@@ -39,24 +45,26 @@ class WorldManager:
         :param new_shape: new world shape tuple
         :return: True if the world was replaced
         """
-        new_shape = np.array(new_shape)
+        # shapes are a handful of ints, plain tuples are cheaper
+        # than small numpy arrays here
+        new_shape = tuple(int(size) for size in new_shape)
         logger.debug("WorldManager: new world shape %s", new_shape)
         if len(new_shape) == self.world.dimension:
             # only changed size of the grid
-            if (new_shape != self.size).any():
-                new_world = WorldModelND(new_shape)
-                min_shape = np.minimum(self.world.shape, new_shape) - 1
-                if (min_shape != 0).all():
-                    # there is some common block to replace
-                    zero = np.zeros(len(min_shape))
-                    common = self.world.query(zero, min_shape)
-                    new_world.replace(zero, min_shape, common)
-                self.world = new_world
+            if new_shape != self.world.shape:
+                # copy the block common to both shapes with a single
+                # slice assignment, the rest of the new grid is empty
+                common = tuple(slice(0, min(old, new)) for old, new in
+                               zip(self.world.shape, new_shape))
+                grid = np.zeros(new_shape, dtype=WorldModelND.dtype)
+                grid[common] = self.world.all()[common]
+                self.world = WorldModelND(new_shape, grid)
             else:
                 # nothing to do
                 return False
         else:
             self.world = WorldModelND(new_shape)
+        self.version += 1
         return True
 
     def set_material(self, material):
@@ -75,13 +83,31 @@ class WorldManager:
         :param q: higher-coordinate corner
         """
         self.world.fill(p, q, self.current_material)
+        self.version += 1
+
+    def build_points(self, points):
+        """
+        Set a batch of world points to the currently selected material.
+        The world version only changes if some point was changed.
+
+        :param points: iterable of point coordinates
+        :return: tuple of the points that changed material
+        """
+        changed = self.world.fill_points(points, self.current_material)
+        if len(changed):
+            self.version += 1
+        return tuple(map(tuple, changed.tolist()))
 
 
 class QtWorldManager(WorldManager, QObject):
     """Gui interface for the world manager."""
 
-    model_changed = pyqtSignal(WorldManager)
-    """Signal emitted when a cell in the world changes."""
+    model_changed = pyqtSignal(WorldManager, object)
+    """
+    Signal emitted when a cell in the world changes.
+    The second argument is the tuple of changed points, or
+    None if any point may have changed.
+    """
 
     model_shape_changed = pyqtSignal(WorldManager)
     """
@@ -111,22 +137,25 @@ class QtWorldManager(WorldManager, QObject):
         self.set_material(material)
 
     @pyqtSlot(tuple)
-    def pick_position(self, pos):
+    def pick_positions(self, positions):
         """
-        PyQt slot that receives a single point selection. This is
-        used by widgets to build an individual voxel.
+        PyQt slot that receives a batch of point selections, e.g.
+        the cells covered by a mouse drag. The world change is
+        signaled once for the whole batch, with only the points
+        that actually changed, and not at all if none did.
 
-        :param pos: n-tuple holding the point coordinates
+        :param positions: tuple of n-tuples holding the points coordinates
         """
-        self.build(np.array(pos), np.array(pos))
-        self.model_changed.emit(self)
+        changed = self.build_points(positions)
+        if changed:
+            self.model_changed.emit(self, changed)
 
     @pyqtSlot()
     def broadcast_world(self):
         """
         PyQt slot that requests a broadcast of a world-changed event.
         """
-        self.model_changed.emit(self)
+        self.model_changed.emit(self, None)
 
     def resize(self, new_shape):
         changed = super().resize(new_shape)
@@ -2,6 +2,7 @@
 Pathfinder GUI entry point
 """
 
+import os
 import logging
 
 from grid_demo.gui import Window
@@ -9,7 +10,10 @@ from grid_demo.gui import Window
 logger = logging.getLogger(__name__)
 
 def main():
-    logging.basicConfig(level=logging.DEBUG)
+    # debug logging is very verbose on the paint path, so it is
+    # enabled on request only, e.g. GRID_DEMO_LOG=DEBUG
+    level = os.environ.get("GRID_DEMO_LOG", "INFO").upper()
+    logging.basicConfig(level=getattr(logging, level, logging.INFO))
     Window.mainloop()
 
 if __name__ == "__main__":